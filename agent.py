@@ -2,8 +2,18 @@ import os
 import re
 from financial_formulas import *
 
+# Profile fields each question type reads; only these go into the cache key
+INTENT_PROFILE_FIELDS = {
+    'retirement_age': ('monthly_savings', 'expected_return', 'age', 'monthly_expenses', 'current_savings'),
+    'money_duration': (),
+    'savings_target': ('expected_return',),
+    'what_if': ('retirement_age', 'age', 'monthly_expenses'),
+    'mortgage_vs_invest': ('debts', 'extra_monthly_budget', 'monthly_savings'),
+    'general': ('age', 'annual_income', 'monthly_savings'),
+}
+
 class FinancialPlanningAgent:
-    def __init__(self):
+    def __init__(self, cache=None):
         # Simple agent without LangChain dependency for now
         # We'll focus on the core functionality that matches PDF requirements
         self.responses = [
@@ -12,35 +22,104 @@ class FinancialPlanningAgent:
             "I'll analyze this step-by-step using proven formulas.",
             "Here's my calculation using time-value-of-money principles:",
         ]
+        # Optional AnswerCache shared across sessions
+        self.cache = cache
+    
+    def classify_question(self, question):
+        """Map a question to the calculation that answers it"""
+        question = question.lower()
+        
+        if "retire" in question and "age" in question:
+            return 'retirement_age'
+        elif "how long" in question and "last" in question:
+            return 'money_duration'
+        elif "save" in question and ("month" in question or "target" in question):
+            return 'savings_target'
+        elif "what if" in question:
+            return 'what_if'
+        elif "mortgage" in question and "invest" in question:
+            return 'mortgage_vs_invest'
+        else:
+            return 'general'
+    
+    def parse_question(self, question):
+        """
+        Extract everything the calculations read from a question, in one place
+        The answer methods only see this parse, never the raw text.
+        """
+        text = question.lower()
+        
+        # Savings targets understand "1 million" and "500k"
+        target_amounts = []
+        for amount in re.findall(r'\$?(\d+(?:,\d+)*(?:\s*(?:million|k))?)', text):
+            amount = amount.replace(',', '').strip()
+            if 'million' in amount:
+                target_amounts.append(float(amount.replace('million', '').strip()) * 1000000)
+            elif 'k' in amount:
+                target_amounts.append(float(amount.replace('k', '').strip()) * 1000)
+            else:
+                target_amounts.append(float(amount))
+        
+        return {
+            'intent': self.classify_question(question),
+            'amounts': [int(amount.replace(',', '')) for amount in re.findall(r'\$?(\d+(?:,\d+)*)', text)],
+            'target_amounts': target_amounts,
+            'rates': [float(rate) / 100 for rate in re.findall(r'(\d+(?:\.\d+)?)\s*%', text)],
+            'years': [int(years) for years in re.findall(r'(\d+)\s*years?', text)],
+            'inflation': 'inflation' in text,
+        }
+    
+    def canonical_key(self, question, user_data, show_work=False):
+        """
+        Canonical form of a question: its parse plus the profile fields its
+        intent reads. Equal keys mean equal inputs to the calculation, so
+        questions that only differ in wording safely share an answer.
+        """
+        parsed = self.parse_question(question)
+        profile = {field: user_data.get(field) for field in INTENT_PROFILE_FIELDS[parsed['intent']]}
+        return {'parsed': parsed, 'profile': profile, 'show_work': show_work}
     
     def process_question(self, question, user_data, show_work=False):
         """Process natural language financial questions"""
+        if self.cache is None:
+            return self.answer_question(self.parse_question(question), user_data, show_work)
+        
+        key = self.canonical_key(question, user_data, show_work)
+        answer = self.cache.get(key)
+        if answer is None:
+            answer = self.answer_question(key['parsed'], user_data, show_work)
+            self.cache.put(key, answer)
+        return answer
+    
+    def answer_question(self, parsed, user_data, show_work=False):
+        """Compute the answer for a parse_question result without consulting the cache"""
         
         # Extract the calculation based on question type
-        if "retire" in question.lower() and "age" in question.lower():
-            return self.calculate_retirement_age(question, user_data, show_work)
+        intent = parsed['intent']
+        if intent == 'retirement_age':
+            return self.calculate_retirement_age(parsed, user_data, show_work)
         
-        elif "how long" in question.lower() and "last" in question.lower():
-            return self.calculate_money_duration(question, user_data, show_work)
+        elif intent == 'money_duration':
+            return self.calculate_money_duration(parsed, user_data, show_work)
         
-        elif "save" in question.lower() and ("month" in question.lower() or "target" in question.lower()):
-            return self.calculate_savings_target(question, user_data, show_work)
+        elif intent == 'savings_target':
+            return self.calculate_savings_target(parsed, user_data, show_work)
         
-        elif "what if" in question.lower():
-            return self.handle_what_if(question, user_data, show_work)
+        elif intent == 'what_if':
+            return self.handle_what_if(parsed, user_data, show_work)
         
-        elif "mortgage" in question.lower() and "invest" in question.lower():
-            return self.mortgage_vs_invest(question, user_data, show_work)
+        elif intent == 'mortgage_vs_invest':
+            return self.mortgage_vs_invest(parsed, user_data, show_work)
         
         else:
-            return self.general_response(question, user_data)
+            return self.general_response(parsed, user_data)
     
-    def calculate_retirement_age(self, question, user_data, show_work):
+    def calculate_retirement_age(self, parsed, user_data, show_work):
         """Handle: 'I'm 35, save $1000 a month, expect 6% return—what age can I retire?'"""
         
-        # Extract numbers from question if provided, otherwise use user profile
-        amounts = re.findall(r'\$?(\d+(?:,\d+)*)', question)
-        rates = re.findall(r'(\d+(?:\.\d+)?)\s*%', question)
+        # Use numbers from the question if provided, otherwise use user profile
+        amounts = parsed['amounts']
+        rates = parsed['rates']
         
         monthly_savings = user_data.get('monthly_savings', 1000)
         expected_return = user_data.get('expected_return', 0.06)
@@ -48,15 +127,16 @@ class FinancialPlanningAgent:
         target_amount = user_data.get('monthly_expenses', 4000) * 12 * 25  # 25 years retirement
         
         if amounts:
-            monthly_savings = int(amounts[0].replace(',', ''))
+            monthly_savings = amounts[0]
         if rates:
-            expected_return = float(rates[0]) / 100
+            expected_return = rates[0]
         
         # Calculate years needed
         try:
+            # Excel sign convention: money paid in (savings, deposits) is negative
             years_needed = calculate_nper(
                 expected_return / 12,  # Monthly rate
-                monthly_savings,
+                -monthly_savings,
                 -user_data.get('current_savings', 0),
                 target_amount
             ) / 12  # Convert to years
@@ -79,22 +159,22 @@ class FinancialPlanningAgent:
         except:
             return "Unable to calculate retirement age with current parameters. You may need to save more or adjust expectations."
     
-    def calculate_money_duration(self, question, user_data, show_work):
+    def calculate_money_duration(self, parsed, user_data, show_work):
         """Handle: 'If I'm retired with $400,000 and withdraw $3,000 a month at 5%, how long will it last?'"""
         
-        # Extract numbers from question
-        amounts = re.findall(r'\$?(\d+(?:,\d+)*)', question)
-        rates = re.findall(r'(\d+(?:\.\d+)?)\s*%', question)
+        # Numbers from the question
+        amounts = parsed['amounts']
+        rates = parsed['rates']
         
         starting_amount = 400000
         monthly_withdrawal = 3000
         annual_rate = 0.05
         
         if len(amounts) >= 2:
-            starting_amount = int(amounts[0].replace(',', ''))
-            monthly_withdrawal = int(amounts[1].replace(',', ''))
+            starting_amount = amounts[0]
+            monthly_withdrawal = amounts[1]
         if rates:
-            annual_rate = float(rates[0]) / 100
+            annual_rate = rates[0]
         
         years_will_last = withdrawal_duration(starting_amount, monthly_withdrawal, annual_rate)
         
@@ -115,28 +195,18 @@ class FinancialPlanningAgent:
         else:
             return f"${starting_amount:,} will last {years_will_last:.1f} years with ${monthly_withdrawal:,}/month withdrawals at {annual_rate*100:.1f}% return."
     
-    def calculate_savings_target(self, question, user_data, show_work):
+    def calculate_savings_target(self, parsed, user_data, show_work):
         """Handle: 'How much must I save monthly to reach $1 million in 25 years?'"""
         
-        # Extract target amount and years
-        amounts = re.findall(r'\$?(\d+(?:,\d+)*(?:\s*(?:million|k))?)', question.lower())
-        years_match = re.findall(r'(\d+)\s*years?', question)
-        
         target_amount = 1000000
         years = 25
         annual_rate = user_data.get('expected_return', 0.07)
         
-        if amounts:
-            amount_str = amounts[0].replace(',', '').replace('$', '').strip()
-            if 'million' in amount_str:
-                target_amount = float(amount_str.replace('million', '').strip()) * 1000000
-            elif 'k' in amount_str:
-                target_amount = float(amount_str.replace('k', '').strip()) * 1000
-            else:
-                target_amount = float(amount_str)
+        if parsed['target_amounts']:
+            target_amount = parsed['target_amounts'][0]
         
-        if years_match:
-            years = int(years_match[0])
+        if parsed['years']:
+            years = parsed['years'][0]
         
         monthly_payment = monthly_payment_needed(target_amount, annual_rate, years)
         
@@ -152,13 +222,12 @@ class FinancialPlanningAgent:
         
         return f"To reach ${target_amount:,} in {years} years at {annual_rate*100:.1f}% return, save ${monthly_payment:,.0f} per month."
     
-    def handle_what_if(self, question, user_data, show_work):
+    def handle_what_if(self, parsed, user_data, show_work):
         """Handle what-if scenarios like inflation questions"""
         
-        if "inflation" in question.lower():
-            # Extract inflation rate
-            rates = re.findall(r'(\d+(?:\.\d+)?)\s*%', question)
-            inflation_rate = float(rates[0]) / 100 if rates else 0.03
+        if parsed['inflation']:
+            rates = parsed['rates']
+            inflation_rate = rates[0] if rates else 0.03
             
             # Calculate impact on retirement needs
             years_to_retirement = user_data.get('retirement_age', 65) - user_data.get('age', 30)
@@ -180,12 +249,16 @@ class FinancialPlanningAgent:
         
         return "Please specify what scenario you'd like to analyze."
     
-    def mortgage_vs_invest(self, question, user_data, show_work):
+    def mortgage_vs_invest(self, parsed, user_data, show_work):
         """Handle: 'Is it smarter to pay down my 3% mortgage or invest at 7%?'"""
         
-        rates = re.findall(r'(\d+(?:\.\d+)?)\s*%', question)
-        mortgage_rate = float(rates[0]) / 100 if len(rates) >= 1 else 0.03
-        invest_rate = float(rates[1]) / 100 if len(rates) >= 2 else 0.07
+        rates = parsed['rates']
+        mortgage_rate = rates[0] if len(rates) >= 1 else 0.03
+        invest_rate = rates[1] if len(rates) >= 2 else 0.07
+        
+        # With a full debt list in the profile, simulate every payoff strategy instead
+        if user_data.get('debts'):
+            return self.debt_payoff_plan(user_data, invest_rate, show_work)
         
         difference = invest_rate - mortgage_rate
         
@@ -204,7 +277,43 @@ class FinancialPlanningAgent:
         else:
             return f"Pay down mortgage! At {mortgage_rate*100:.1f}% mortgage vs {invest_rate*100:.1f}% return, you'll save {abs(difference)*100:.1f}% by paying down debt."
     
-    def general_response(self, question, user_data):
+    def debt_payoff_plan(self, user_data, invest_rate, show_work):
+        """Compare avalanche, snowball and investing the extra for the profile's debts"""
+        from debt_payoff import compare_payoff_strategies
+        
+        debts = user_data['debts']
+        extra_budget = user_data.get('extra_monthly_budget', user_data.get('monthly_savings', 0))
+        years = 30
+        results = compare_payoff_strategies(
+            [debt['balance'] for debt in debts],
+            [debt['apr'] for debt in debts],
+            [debt['minimum'] for debt in debts],
+            extra_budget,
+            invest_rate=invest_rate,
+            months=years * 12
+        )
+        labels = {'avalanche': "Avalanche (highest rate first)", 'snowball': "Snowball (smallest balance first)", 'invest': "Invest the extra"}
+        best = max(results, key=lambda strategy: float(results[strategy]['final_net_worth']))
+        
+        steps = []
+        for strategy, result in results.items():
+            debt_free = float(result['debt_free_month'])
+            debt_free_text = f"debt-free in {debt_free/12:.1f} years" if debt_free != float('inf') else f"not debt-free within {years} years"
+            steps.append(f"{labels[strategy]}: ${float(result['total_interest']):,.0f} interest, {debt_free_text}, net worth ${float(result['final_net_worth']):,.0f} after {years} years")
+        
+        answer = f"{labels[best]} wins with ${float(results[best]['final_net_worth']):,.0f} net worth after {years} years"
+        if show_work:
+            return self.format_with_work(
+                answer,
+                "Month-by-Month Debt Payoff Simulation",
+                f"Debts: {len(debts)} totaling ${sum(debt['balance'] for debt in debts):,.0f}",
+                f"Extra monthly budget: ${extra_budget:,}",
+                f"Investment return: {invest_rate*100:.1f}%",
+                *steps
+            )
+        return answer + "."
+    
+    def general_response(self, parsed, user_data):
         """Handle general questions"""
         user_profile = f"Age: {user_data.get('age')}, Income: ${user_data.get('annual_income'):,}, Savings: ${user_data.get('monthly_savings'):,}/month"
         
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Bump when answer wording or formulas change so stale answers are not served
+CACHE_VERSION = 3
+DEFAULT_PATH = os.environ.get('ANSWER_CACHE_PATH', 'answer_cache.sqlite')
+
+
+class AnswerCache:
+    """
+    SQLite-backed cache of agent answers keyed on the canonical question
+    Entries survive restarts; the least recently used are evicted once the
+    cache grows past max_entries.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Streamlit reruns scripts on different threads, so share one guarded connection
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "key TEXT PRIMARY KEY, answer TEXT NOT NULL, last_used REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+
+    @staticmethod
+    def make_key(canonical):
+        """Stable hash of a canonical question (see FinancialPlanningAgent.canonical_key)"""
+        payload = json.dumps([CACHE_VERSION, canonical], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, canonical):
+        """Return the cached answer or None"""
+        key = self.make_key(canonical)
+        with self._lock:
+            row = self._conn.execute("SELECT answer FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE answers SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+            )
+            return row[0]
+
+    def put(self, canonical, answer):
+        """Store an answer, evicting least recently used entries past max_entries"""
+        key = self.make_key(canonical)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, answer, last_used, hits) VALUES (?, ?, ?, 0)",
+                (key, answer, time.time()),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            if count > self.max_entries:
+                # Trim to 90% so eviction runs once per batch of inserts, not on every put
+                keep = int(self.max_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM answers WHERE key IN "
+                    "(SELECT key FROM answers ORDER BY last_used ASC LIMIT ?)",
+                    (count - keep,),
+                )
+
+    def stats(self):
+        """Hit-rate statistics for this process plus lifetime hits stored on disk"""
+        with self._lock:
+            entries, stored_hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM answers"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'lifetime_hits': stored_hits,
+        }
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+
+    def close(self):
+        self._conn.close()
@@ -1,18 +1,26 @@
 import streamlit as st
 import pandas as pd
 from financial_formulas import *
+from advanced_features import create_growth_chart, create_tornado_chart, retirement_scenarios_table
 import plotly.express as px
 import plotly.graph_objects as go
 from agent import FinancialPlanningAgent
+from answer_cache import AnswerCache
+from sensitivity import plan_sensitivities
 
 # Page config
 st.set_page_config(page_title="Financial Planning Agent", page_icon="💰", layout="wide")
 st.title("💰 Your Personal Financial Planning Agent")
 st.markdown("*Get instant retirement planning advice - no AI API needed!*")
 
+@st.cache_resource
+def get_answer_cache():
+    """One persistent answer cache shared by every session"""
+    return AnswerCache()
+
 # Initialize session state
 if 'agent' not in st.session_state:
-    st.session_state.agent = FinancialPlanningAgent()
+    st.session_state.agent = FinancialPlanningAgent(cache=get_answer_cache())
 if 'user_data' not in st.session_state:
     st.session_state.user_data = {}
 if 'step' not in st.session_state:
@@ -54,29 +62,14 @@ def show_analysis():
     data = st.session_state.user_data
     st.subheader(f"📈 {data['name']}'s Retirement Analysis")
     
-    # Core calculations
-    years_to_retirement = data['retirement_age'] - data['age']
-    years_in_retirement = 25  # Assume 25 years in retirement
-    
-    # Future value of current savings
-    current_savings_future = future_value(
-        data['current_savings'], 
-        data['expected_return'], 
-        years_to_retirement
-    )
-    
-    # Future value of monthly savings
-    monthly_savings_future = monthly_savings_future_value(
-        data['monthly_savings'],
-        data['expected_return'],
-        years_to_retirement
-    )
-    
-    total_retirement_fund = current_savings_future + monthly_savings_future
-    
-    # How much needed for retirement
-    retirement_needs = data['monthly_expenses'] * 12 * years_in_retirement
-    retirement_needs_pv = present_value(retirement_needs, data['expected_return'], years_to_retirement)
+    # Core calculations (assumes 25 years in retirement)
+    summary = plan_summary(data)
+    years_to_retirement = summary['years_to_retirement']
+    years_in_retirement = summary['years_in_retirement']
+    current_savings_future = summary['current_savings_future']
+    monthly_savings_future = summary['monthly_savings_future']
+    total_retirement_fund = summary['total_retirement_fund']
+    retirement_needs = summary['retirement_needs']
     
     # Display key metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -88,7 +81,7 @@ def show_analysis():
     with col3:
         st.metric("Retirement Needs", f"${retirement_needs:,.0f}")
     with col4:
-        surplus_deficit = total_retirement_fund - retirement_needs_pv
+        surplus_deficit = summary['surplus_deficit']
         st.metric("Surplus/Deficit", f"${surplus_deficit:,.0f}", 
                  delta_color="normal" if surplus_deficit >= 0 else "inverse")
     
@@ -109,7 +102,7 @@ def show_analysis():
     
     with col2:
         st.markdown("### 🎯 Retirement Analysis:")
-        monthly_income_from_savings = total_retirement_fund / years_in_retirement / 12
+        monthly_income_from_savings = summary['monthly_income']
         st.write(f"• You want ${data['monthly_expenses']:,}/month in retirement")
         st.write(f"• Your savings can provide **${monthly_income_from_savings:,.0f}/month**")
         
@@ -131,6 +124,9 @@ def show_analysis():
     fig = create_growth_chart(data)
     st.plotly_chart(fig, use_container_width=True)
     
+    # What moves the plan most
+    st.plotly_chart(create_tornado_chart(data), use_container_width=True)
+    
     # Scenarios table
     st.subheader("🎯 Compare Scenarios")
     scenarios_df = retirement_scenarios_table(data)
@@ -287,6 +283,12 @@ def show_what_if_return_rate(new_rate):
     
     difference = new_total - original_total
     
+    # Slope of the projected fund at the current rate (closed form, safe when the rates match)
+    per_point = float(plan_sensitivities(
+        data['current_savings'], data['monthly_savings'], data['expected_return'],
+        data['age'], data['retirement_age'], data['monthly_expenses']
+    )['fund']['expected_return']) / 100
+    
     st.info(f"""
     📊 **Impact of {new_rate*100:.0f}% vs {data['expected_return']*100:.0f}% return:**
     
@@ -294,7 +296,7 @@ def show_what_if_return_rate(new_rate):
     • At {new_rate*100:.0f}%: ${new_total:,.0f}
     • **Difference: ${difference:,.0f}**
     
-    💡 Every 1% difference in returns = ${(new_total-original_total)/(new_rate-data['expected_return'])/100:,.0f} difference!
+    💡 Near your current rate, every 1% difference in returns ≈ ${per_point:,.0f} difference!
     """)
 
 def handle_natural_language_questions():
@@ -360,6 +362,9 @@ with st.sidebar:
         st.write(f"• Savings: ${data['monthly_savings']}/month")
         st.write(f"• Return: {data['expected_return']*100:.0f}%")
     
+    cache_stats = get_answer_cache().stats()
+    st.caption(f"⚡ Answer cache: {cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']:,} saved answers")
+    
     st.markdown("---")
     st.markdown("### 🔢 Mini Calculators")
     
@@ -0,0 +1,310 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from reports import coerce_profile, load_profiles
+
+DEFAULT_PATH = os.environ.get('PLAN_STATE_PATH', 'plan_state.sqlite')
+
+# SQLite caps the number of bound parameters per statement
+_QUERY_CHUNK = 900
+
+
+def month_number(month):
+    """'2026-10' -> absolute month count, so month differences are plain subtraction"""
+    try:
+        year, number = (int(part) for part in str(month)[:7].split('-'))
+    except ValueError:
+        raise ValueError(f"month is not YYYY-MM: {month!r}")
+    if not 1 <= number <= 12:
+        raise ValueError(f"month is not YYYY-MM: {month!r}")
+    return year * 12 + number - 1
+
+
+def coerce_feed_record(record):
+    """
+    Validate one raw feed record into (client_id, month number, balance, contribution)
+    Raises ValueError describing the first problem found.
+    """
+    if '_error' in record:
+        raise ValueError(record['_error'])
+    for field in ('client_id', 'month', 'balance'):
+        if record.get(field) in (None, ''):
+            raise ValueError(f"missing {field}")
+    values = {}
+    for field in ('balance', 'contribution'):
+        try:
+            values[field] = float(record.get(field) or 0)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} is not a number: {record[field]!r}")
+        if not np.isfinite(values[field]):
+            raise ValueError(f"{field} is not a number: {record[field]!r}")
+    return str(record['client_id']), month_number(record['month']), values['balance'], values['contribution']
+
+
+def load_feed(path):
+    """
+    Read a CSV, JSON-lines or JSON drop of monthly client_id/month/balance/contribution records
+    Bad records are skipped so they cannot stop the nightly batch.
+    Returns (feed columns, [(record number, reason)] for the skipped records)
+    """
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            records = list(csv.DictReader(f))
+    elif path.endswith('.jsonl'):
+        records = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError as exc:
+                        records.append({'_error': f"invalid JSON line: {exc}"})
+    else:
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+
+    rows = []
+    rejected = []
+    for number, record in enumerate(records, 1):
+        try:
+            rows.append(coerce_feed_record(record))
+        except ValueError as exc:
+            rejected.append((number, str(exc)))
+    client_id, month, balance, contribution = zip(*rows) if rows else ((), (), (), ())
+    return {
+        'client_id': np.array(client_id, dtype=object),
+        'month': np.array(month, dtype=np.int64),
+        'balance': np.array(balance, dtype=float),
+        'contribution': np.array(contribution, dtype=float),
+    }, rejected
+
+
+def _growth(monthly_rate, months):
+    """(1 + m)^k and the monthly annuity factor ((1 + m)^k - 1) / m, vectorized"""
+    compound = (1 + monthly_rate) ** months
+    small = np.abs(monthly_rate) < 1e-12
+    annuity = np.where(small, months, (compound - 1) / np.where(small, 1.0, monthly_rate))
+    return compound, annuity
+
+
+class PlanStore:
+    """
+    Checkpointed plan state per client in a local SQLite file
+    Each plan keeps its original inputs (to replay the original projection) and
+    the last actual balance ingested, so monthly feeds only re-project the
+    remaining horizon of the clients they mention.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS plans (
+                client_id TEXT PRIMARY KEY,
+                start_month INTEGER NOT NULL,
+                horizon_months INTEGER NOT NULL,
+                current_savings REAL NOT NULL,
+                monthly_savings REAL NOT NULL,
+                expected_return REAL NOT NULL,
+                original_fund REAL NOT NULL,
+                checkpoint_month INTEGER NOT NULL,
+                checkpoint_balance REAL NOT NULL,
+                contributions REAL NOT NULL DEFAULT 0,
+                projected_fund REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS drift (
+                client_id TEXT NOT NULL,
+                month_index INTEGER NOT NULL,
+                actual_balance REAL NOT NULL,
+                expected_balance REAL NOT NULL,
+                contribution REAL NOT NULL,
+                PRIMARY KEY (client_id, month_index)
+            );
+        """)
+
+    def register_plans(self, profiles, start_month):
+        """Checkpoint month 0 for each profile (needs client_id); re-registering resets a plan"""
+        start = month_number(start_month)
+        rows = []
+        for profile in profiles:
+            horizon = (profile['retirement_age'] - profile['age']) * 12
+            monthly_rate = (1 + profile['expected_return']) ** (1/12) - 1
+            compound, annuity = _growth(monthly_rate, horizon)
+            fund = float(profile['current_savings'] * compound + profile['monthly_savings'] * annuity)
+            rows.append((str(profile['client_id']), start, horizon, profile['current_savings'],
+                         profile['monthly_savings'], profile['expected_return'], fund,
+                         0, profile['current_savings'], 0.0, fund, time.time()))
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.executemany("DELETE FROM drift WHERE client_id = ?", [(row[0],) for row in rows])
+        return len(rows)
+
+    def _load_plans(self, client_ids):
+        plans = {}
+        for i in range(0, len(client_ids), _QUERY_CHUNK):
+            chunk = client_ids[i:i + _QUERY_CHUNK]
+            query = (
+                "SELECT client_id, start_month, horizon_months, current_savings, monthly_savings, "
+                "expected_return, original_fund, checkpoint_month, contributions "
+                f"FROM plans WHERE client_id IN ({','.join('?' * len(chunk))})"
+            )
+            for row in self._conn.execute(query, chunk):
+                plans[row[0]] = row[1:]
+        return plans
+
+    def ingest(self, feed):
+        """
+        Apply one feed (see load_feed) to the stored plans
+        Records at or before a client's checkpoint, past its horizon, or for unknown
+        clients are skipped, so replaying a feed is harmless; of repeated records for
+        the same client and month only the last counts. For every client with
+        new records the remaining horizon is re-projected from the latest actual
+        balance and drift against the original projection is recorded.
+        Returns one summary dict per updated client.
+        """
+        # A repeated client/month keeps only its last record, like the drift table does
+        last_record = {key: i for i, key in enumerate(zip(feed['client_id'].tolist(), feed['month'].tolist()))}
+        if len(last_record) < len(feed['month']):
+            keep = np.array(sorted(last_record.values()))
+            feed = {name: column[keep] for name, column in feed.items()}
+
+        clients = list(dict.fromkeys(feed['client_id']))
+        plans = self._load_plans(clients)
+        known = np.array([client in plans for client in feed['client_id']], dtype=bool)
+        if not known.any():
+            return []
+
+        # Per-record plan columns, gathered once so the maths below is vectorized
+        client_id = feed['client_id'][known]
+        plan = np.array([plans[client] for client in client_id], dtype=float)
+        start, horizon, savings, monthly, rate, original_fund, checkpoint, contributions = plan.T
+        month_index = feed['month'][known] - start
+        fresh = (month_index > checkpoint) & (month_index <= horizon)
+        if not fresh.any():
+            return []
+
+        client_id = client_id[fresh]
+        month_index = month_index[fresh]
+        balance = feed['balance'][known][fresh]
+        contribution = feed['contribution'][known][fresh]
+        horizon, savings, monthly, rate, original_fund, contributions = (
+            column[fresh] for column in (horizon, savings, monthly, rate, original_fund, contributions))
+
+        # Where the original plan expected each balance to be
+        monthly_rate = (1 + rate) ** (1/12) - 1
+        compound, annuity = _growth(monthly_rate, month_index)
+        expected = savings * compound + monthly * annuity
+
+        # Latest record per client becomes the new checkpoint
+        order = np.lexsort((month_index, client_id.astype(str)))
+        sorted_ids = client_id[order]
+        last = order[np.append(sorted_ids[1:] != sorted_ids[:-1], True)]
+        total_contributions = {}
+        for client, amount in zip(client_id, contribution):
+            total_contributions[client] = total_contributions.get(client, 0.0) + amount
+
+        # Re-project only the months left after the checkpoint
+        remaining = horizon[last] - month_index[last]
+        compound, annuity = _growth(monthly_rate[last], remaining)
+        projected_fund = balance[last] * compound + monthly[last] * annuity
+
+        now = time.time()
+        summaries = []
+        updates = []
+        for j, i in enumerate(last):
+            client = client_id[i]
+            contributed = contributions[i] + total_contributions[client]
+            updates.append((int(month_index[i]), float(balance[i]), contributed,
+                            float(projected_fund[j]), now, client))
+            summaries.append({
+                'client_id': client,
+                'month_index': int(month_index[i]),
+                'actual_balance': float(balance[i]),
+                'expected_balance': float(expected[i]),
+                'balance_drift': float(balance[i] - expected[i]),
+                'contribution_gap': float(contributed - monthly[i] * month_index[i]),
+                'original_fund': float(original_fund[i]),
+                'projected_fund': float(projected_fund[j]),
+                'fund_drift': float(projected_fund[j] - original_fund[i]),
+            })
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO drift VALUES (?, ?, ?, ?, ?)",
+                zip(client_id.tolist(), month_index.astype(int).tolist(), balance.tolist(),
+                    expected.tolist(), contribution.tolist()),
+            )
+            self._conn.executemany(
+                "UPDATE plans SET checkpoint_month = ?, checkpoint_balance = ?, contributions = ?, "
+                "projected_fund = ?, updated_at = ? WHERE client_id = ?",
+                updates,
+            )
+        return summaries
+
+    def drift_history(self, client_id):
+        """Monthly actual vs originally expected balances for one client"""
+        return self._conn.execute(
+            "SELECT month_index, actual_balance, expected_balance, actual_balance - expected_balance, contribution "
+            "FROM drift WHERE client_id = ? ORDER BY month_index",
+            (client_id,),
+        ).fetchall()
+
+    def close(self):
+        self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update client plans from monthly balance feeds")
+    parser.add_argument("--store", default=DEFAULT_PATH, help="Plan state SQLite file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    register = commands.add_parser("register", help="Checkpoint plans from a profile file")
+    register.add_argument("profiles", help="CSV, JSON-lines or JSON profiles with client_id")
+    register.add_argument("--start", required=True, help="Month the profiles describe, e.g. 2026-10")
+
+    ingest = commands.add_parser("ingest", help="Apply balance feed drops")
+    ingest.add_argument("feeds", nargs="+", help="CSV, JSON-lines or JSON feed files")
+    ingest.add_argument("--drift-report", help="Write per-client drift summaries to this CSV")
+    args = parser.parse_args()
+
+    store = PlanStore(args.store)
+    rejected = []
+    if args.command == "register":
+        profiles = []
+        for number, record in enumerate(load_profiles(args.profiles), 1):
+            try:
+                if record.get('client_id') in (None, ''):
+                    raise ValueError("missing client_id")
+                profiles.append(coerce_profile(record))
+            except ValueError as exc:
+                rejected.append((args.profiles, number, str(exc)))
+        count = store.register_plans(profiles, args.start)
+        print(f"✅ Registered {count} plans")
+    else:
+        summaries = []
+        for path in sorted(args.feeds):
+            feed, skipped = load_feed(path)
+            rejected.extend((path, number, reason) for number, reason in skipped)
+            summaries.extend(store.ingest(feed))
+        if args.drift_report and summaries:
+            with open(args.drift_report, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=list(summaries[0]))
+                writer.writeheader()
+                writer.writerows(summaries)
+        print(f"✅ Updated {len({summary['client_id'] for summary in summaries})} plans")
+    if rejected:
+        print(f"⚠️ Skipped {len(rejected)} bad records")
+        for path, number, reason in rejected:
+            print(f"  {path} record {number}: {reason}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
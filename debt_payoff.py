@@ -0,0 +1,130 @@
+import numpy as np
+
+PAYOFF_STRATEGIES = ("avalanche", "snowball", "invest")
+
+
+def _priority_order(balances, aprs, strategy):
+    """Order in which extra payments are applied to each scenario's debts"""
+    if strategy == "avalanche":
+        return np.argsort(-aprs, axis=-1, kind="stable")
+    if strategy == "snowball":
+        return np.argsort(balances, axis=-1, kind="stable")
+    if strategy == "invest":
+        return np.broadcast_to(np.arange(balances.shape[-1]), balances.shape)
+    raise ValueError(f"Unknown strategy {strategy!r}, expected one of {PAYOFF_STRATEGIES}")
+
+
+def simulate_debt_payoff(balances, aprs, minimums, extra_budget, strategy="avalanche",
+                         invest_share=0.0, invest_rate=0.07, months=360, keep_path=True):
+    """
+    Month-by-month payoff of several debts, vectorized across scenarios
+    balances, aprs, minimums: (..., n_debts); leading axes are scenarios (clients, budget splits)
+    extra_budget: monthly money on top of the minimums, broadcast against the leading axes
+    strategy: "avalanche" (highest APR first), "snowball" (smallest balance first)
+        or "invest" (minimums only, everything else invested)
+    invest_share: share of extra_budget invested instead of prepaying debt
+    Minimums freed by paid-off debts roll into the extra payments (or investments
+    for "invest"); once all debts are gone the whole budget is invested.
+    keep_path: record the monthly net_worth path; pass False when only the final
+        state is needed to skip the (..., months + 1) array
+    Returns a dict with total_interest, payoff_month (..., n_debts; inf if never paid),
+    debt_free_month, net_worth (..., months + 1; only with keep_path) and final_net_worth
+    """
+    balances = np.array(balances, dtype=float)
+    aprs = np.broadcast_to(np.asarray(aprs, dtype=float), balances.shape)
+    minimums = np.broadcast_to(np.asarray(minimums, dtype=float), balances.shape)
+    lead = balances.shape[:-1]
+    extra_budget = np.broadcast_to(np.asarray(extra_budget, dtype=float), lead)
+    invest_share = np.broadcast_to(np.asarray(1.0 if strategy == "invest" else invest_share, dtype=float), lead)
+
+    order = _priority_order(balances, aprs, strategy)
+    monthly_apr = aprs / 12
+    monthly_invest_rate = (1 + invest_rate) ** (1/12) - 1
+    total_minimums = minimums.sum(axis=-1)
+
+    investments = np.zeros(lead)
+    total_interest = np.zeros(lead)
+    payoff_month = np.where(balances <= 0, 0.0, np.inf)
+    if keep_path:
+        net_worth = np.empty(lead + (months + 1,))
+        net_worth[..., 0] = -balances.sum(axis=-1)
+
+    for month in range(months):
+        interest = balances * monthly_apr
+        total_interest += interest.sum(axis=-1)
+        balances += interest
+
+        paid = np.minimum(minimums, balances)
+        balances -= paid
+
+        # Budget left after minimums: the extra plus minimums freed by paid-off debts
+        freed = total_minimums - paid.sum(axis=-1)
+        to_invest = extra_budget * invest_share + (freed if strategy == "invest" else 0)
+        prepay = extra_budget + freed - to_invest
+
+        # Pour the prepayment into the debts in priority order
+        ordered = np.take_along_axis(balances, order, axis=-1)
+        already_covered = np.cumsum(ordered, axis=-1) - ordered
+        extra_paid = np.clip(prepay[..., None] - already_covered, 0, ordered)
+        np.put_along_axis(balances, order, ordered - extra_paid, axis=-1)
+        to_invest = to_invest + prepay - extra_paid.sum(axis=-1)
+
+        investments = investments * (1 + monthly_invest_rate) + to_invest
+
+        newly_paid = (balances <= 0.005) & np.isinf(payoff_month)
+        payoff_month[newly_paid] = month + 1
+        balances[balances <= 0.005] = 0.0
+        if keep_path:
+            net_worth[..., month + 1] = investments - balances.sum(axis=-1)
+
+    results = {
+        "total_interest": total_interest,
+        "payoff_month": payoff_month,
+        "debt_free_month": payoff_month.max(axis=-1),
+        "final_net_worth": investments - balances.sum(axis=-1),
+    }
+    if keep_path:
+        results["net_worth"] = net_worth
+    return results
+
+
+def compare_payoff_strategies(balances, aprs, minimums, extra_budget, invest_rate=0.07, months=360):
+    """Avalanche, snowball and invest-instead for the same debts: {strategy: results}"""
+    return {
+        strategy: simulate_debt_payoff(balances, aprs, minimums, extra_budget, strategy,
+                                       invest_rate=invest_rate, months=months)
+        for strategy in PAYOFF_STRATEGIES
+    }
+
+
+def best_budget_split(balances, aprs, minimums, extra_budget, strategy="avalanche",
+                      splits=1001, invest_rate=0.07, months=360, client_chunk=256):
+    """
+    Search invest/prepay splits of the extra budget for every client at once
+    balances, aprs, minimums: (n_clients, n_debts) for a whole client book
+    splits: number of evenly spaced invest shares between 0 and 1
+    client_chunk: clients simulated per pass; working memory is about
+        client_chunk * splits * n_debts floats per temporary, whatever the book size
+    Returns (best invest share per client, final net worth per client and split)
+    """
+    balances = np.atleast_2d(np.asarray(balances, dtype=float))
+    shares = np.linspace(0.0, 1.0, splits)
+    n_clients, n_debts = balances.shape
+    aprs = np.broadcast_to(np.asarray(aprs, dtype=float), balances.shape)
+    minimums = np.broadcast_to(np.asarray(minimums, dtype=float), balances.shape)
+    extra_budget = np.broadcast_to(np.asarray(extra_budget, dtype=float).reshape(-1), (n_clients,))
+
+    final = np.empty((n_clients, splits))
+    for start in range(0, n_clients, client_chunk):
+        chunk = slice(start, start + client_chunk)
+        size = len(balances[chunk])
+
+        # Scenario grid: (chunk clients, splits, n_debts)
+        def grid(values):
+            return np.broadcast_to(values[chunk, None, :], (size, splits, n_debts))
+
+        extra = np.broadcast_to(extra_budget[chunk, None], (size, splits))
+        final[chunk] = simulate_debt_payoff(grid(balances), grid(aprs), grid(minimums), extra, strategy,
+                                            invest_share=shares, invest_rate=invest_rate, months=months,
+                                            keep_path=False)["final_net_worth"]
+    return shares[final.argmax(axis=-1)], final
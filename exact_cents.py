@@ -0,0 +1,154 @@
+import math
+
+import numpy as np
+
+# How fractional cents of interest are settled each period
+ROUNDING_MODES = ("half_even", "half_up", "down")
+
+
+def to_cents(amount):
+    """Convert dollar amounts to int64 cents (half-even on the third decimal)"""
+    return np.rint(np.asarray(amount, dtype=float) * 100).astype(np.int64)
+
+
+def from_cents(cents):
+    """Convert int64 cents back to dollars"""
+    return np.asarray(cents) / 100
+
+
+def round_cents(values, rounding="half_even"):
+    """Round fractional cents to int64 cents using the given rounding rule"""
+    values = np.asarray(values, dtype=float)
+    if rounding == "half_even":
+        rounded = np.rint(values)
+    elif rounding == "half_up":
+        rounded = np.sign(values) * np.floor(np.abs(values) + 0.5)
+    elif rounding == "down":
+        rounded = np.trunc(values)
+    else:
+        raise ValueError(f"Unknown rounding mode {rounding!r}, expected one of {ROUNDING_MODES}")
+    return rounded.astype(np.int64)
+
+
+def round_cent(value, rounding="half_even"):
+    """Scalar round_cents for the single-account schedules below"""
+    if rounding == "half_even":
+        return round(value)
+    if rounding == "half_up":
+        return int(math.copysign(math.floor(abs(value) + 0.5), value))
+    if rounding == "down":
+        return int(value)
+    raise ValueError(f"Unknown rounding mode {rounding!r}, expected one of {ROUNDING_MODES}")
+
+
+def whole_periods(periods, name="periods"):
+    """Exact schedules only step whole periods; reject stubs instead of truncating them"""
+    if periods < 0 or periods != int(periods):
+        raise ValueError(f"exact mode needs a whole, non-negative number of {name}, got {periods}")
+    return int(periods)
+
+
+def accumulate_cents_scalar(start_cents, payment_cents, rate, periods, rounding="half_even"):
+    """
+    accumulate_cents for one account at a constant rate, in plain Python ints
+    Per-period rounding has no closed form, so this is O(periods): roughly 0.3 µs
+    per period, i.e. ~100 µs for a 30-year monthly schedule versus <1 µs for the
+    float formula (a few hundred times slower). Batch many accounts through
+    accumulate_cents, where the per-period cost is shared across the batch.
+    """
+    balance = int(start_cents)
+    payment_cents = int(payment_cents)
+    rate = float(rate)
+    if rounding == "half_even":
+        # Inlined fast path for the default rule
+        for _ in range(periods):
+            balance += round(balance * rate) + payment_cents
+        return balance
+    for _ in range(periods):
+        balance += round_cent(balance * rate, rounding) + payment_cents
+    return balance
+
+
+def withdraw_cents_scalar(start_cents, withdrawal_cents, rate, rounding="half_even"):
+    """
+    Periods until one account is depleted at a constant rate, in plain Python ints
+    Counts the final partial period like withdraw_cents; returns inf as soon as
+    rounded interest covers the withdrawal, since the balance can then never fall.
+    Periods are only stepped while interest rounds to a nonzero amount; once it
+    rounds to zero (always at a zero rate) the rest is closed form. That bounds
+    the loop at about ln(2 * withdrawal_cents) / ln(1 + rate) steps for a positive
+    rate (the shortfall of interest below the withdrawal grows by 1 + rate each
+    period) and ln(2 * |first interest|) / -ln(1 + rate) for a negative one.
+    """
+    balance = int(start_cents)
+    withdrawal_cents = int(withdrawal_cents)
+    rate = float(rate)
+    periods = 0
+    while True:
+        interest = round_cent(balance * rate, rounding)
+        if interest == 0:
+            # The balance can only fall from here, so interest stays zero
+            if withdrawal_cents <= 0:
+                return float('inf')
+            if balance <= 0:
+                return float(periods)
+            full = (balance - 1) // withdrawal_cents
+            return periods + full + (balance - full * withdrawal_cents) / withdrawal_cents
+        available = balance + interest
+        if available - withdrawal_cents >= balance:
+            return float('inf')
+        if available <= withdrawal_cents:
+            return periods + (available / withdrawal_cents if available > 0 else 0.0)
+        balance = available - withdrawal_cents
+        periods += 1
+
+
+def accumulate_cents(start_cents, payment_cents, rates, active=None, rounding="half_even"):
+    """
+    Savings schedule in exact cents: each period interest is rounded to the
+    cent, then the payment is added at period end.
+    start_cents, payment_cents: int64, broadcast against rates[..., 0]
+    rates: periodic rates of shape (..., periods)
+    active: optional boolean mask (..., periods); inactive periods leave the balance unchanged
+    Returns int64 balances of shape (..., periods + 1)
+    """
+    rates = np.asarray(rates, dtype=float)
+    lead = rates.shape[:-1]
+    periods = rates.shape[-1]
+    payment_cents = np.asarray(payment_cents, dtype=np.int64)
+
+    balances = np.empty(lead + (periods + 1,), dtype=np.int64)
+    balances[..., 0] = start_cents
+    for period in range(periods):
+        balance = balances[..., period]
+        interest = round_cents(balance * rates[..., period], rounding)
+        grown = balance + interest + payment_cents
+        if active is not None:
+            grown = np.where(active[..., period], grown, balance)
+        balances[..., period + 1] = grown
+    return balances
+
+
+def withdraw_cents(start_cents, withdrawal_cents, rates, rounding="half_even"):
+    """
+    Withdrawal schedule in exact cents, floored at zero once depleted
+    Returns (int64 balances (..., periods + 1), periods_lasted) where
+    periods_lasted counts the final partial period and is inf if never depleted
+    """
+    rates = np.asarray(rates, dtype=float)
+    lead = rates.shape[:-1]
+    periods = rates.shape[-1]
+    withdrawal_cents = np.asarray(withdrawal_cents, dtype=np.int64)
+
+    balances = np.empty(lead + (periods + 1,), dtype=np.int64)
+    balances[..., 0] = start_cents
+    depleted_at = np.full(lead, np.inf)
+    for period in range(periods):
+        available = balances[..., period] + round_cents(balances[..., period] * rates[..., period], rounding)
+        after = available - withdrawal_cents
+        newly_depleted = (after <= 0) & np.isinf(depleted_at)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            partial = np.clip(available / withdrawal_cents, 0, 1)
+        depleted_at = np.where(newly_depleted, period + partial, depleted_at)
+        balances[..., period + 1] = np.maximum(after, 0)
+    return balances, depleted_at
@@ -1,7 +1,16 @@
 import math
 
-def future_value(present_value, annual_rate, years):
-    """Calculate future value: FV = PV × (1 + r)^n"""
+def future_value(present_value, annual_rate, years, exact=False, rounding="half_even"):
+    """
+    Calculate future value: FV = PV × (1 + r)^n
+    exact=True compounds in integer cents, rounding interest every year
+    (whole years only; cost grows with the number of years)
+    """
+    if exact:
+        from exact_cents import accumulate_cents_scalar, round_cent, whole_periods
+        cents = accumulate_cents_scalar(round_cent(present_value * 100), 0, annual_rate,
+                                        whole_periods(years, "years"), rounding)
+        return cents / 100
     return present_value * (1 + annual_rate) ** years
 
 def present_value(future_value, annual_rate, years):
@@ -14,10 +23,19 @@ def future_value_annuity(payment, annual_rate, years):
         return payment * years
     return payment * ((1 + annual_rate) ** years - 1) / annual_rate
 
-def monthly_savings_future_value(monthly_payment, annual_rate, years):
-    """Calculate future value of monthly savings"""
+def monthly_savings_future_value(monthly_payment, annual_rate, years, exact=False, rounding="half_even"):
+    """
+    Calculate future value of monthly savings
+    exact=True runs the schedule in integer cents, rounding interest every month
+    (whole months only; ~100 µs for 30 years versus <1 µs for the formula)
+    """
     monthly_rate = (1 + annual_rate) ** (1/12) - 1
     months = years * 12
+    if exact:
+        from exact_cents import accumulate_cents_scalar, round_cent, whole_periods
+        cents = accumulate_cents_scalar(0, round_cent(monthly_payment * 100), monthly_rate,
+                                        whole_periods(round(months, 9), "months"), rounding)
+        return cents / 100
     if monthly_rate == 0:
         return monthly_payment * months
     return monthly_payment * ((1 + monthly_rate) ** months - 1) / monthly_rate
@@ -39,12 +57,23 @@ def monthly_payment_needed(target_amount, annual_rate, years):
         return target_amount / months
     return target_amount * monthly_rate / ((1 + monthly_rate) ** months - 1)
 
-def withdrawal_duration(starting_amount, monthly_withdrawal, annual_rate):
-    """How long money will last with withdrawals"""
+def withdrawal_duration(starting_amount, monthly_withdrawal, annual_rate, exact=False, rounding="half_even"):
+    """
+    How long money will last with withdrawals
+    exact=True steps the balance month by month in integer cents while interest
+    rounds to a nonzero amount (see withdraw_cents_scalar); "forever" is then
+    decided on the rounded interest
+    """
+    monthly_rate = (1 + annual_rate) ** (1/12) - 1
+    if exact:
+        from exact_cents import round_cent, withdraw_cents_scalar
+        months = withdraw_cents_scalar(round_cent(starting_amount * 100), round_cent(monthly_withdrawal * 100),
+                                       monthly_rate, rounding)
+        return months / 12
+    
     if annual_rate == 0:
         return starting_amount / monthly_withdrawal / 12
     
-    monthly_rate = (1 + annual_rate) ** (1/12) - 1
     if monthly_withdrawal <= starting_amount * monthly_rate:
         return float('inf')  # Money lasts forever
     
@@ -52,6 +81,64 @@ def withdrawal_duration(starting_amount, monthly_withdrawal, annual_rate):
     return months / 12
 
 
+def plan_summary(user_data, years_in_retirement=25):
+    """Core retirement projection for a profile (analysis page and batch reports)"""
+    years_to_retirement = user_data['retirement_age'] - user_data['age']
+    current_savings_future = future_value(user_data['current_savings'], user_data['expected_return'], years_to_retirement)
+    monthly_savings_future = monthly_savings_future_value(user_data['monthly_savings'], user_data['expected_return'], years_to_retirement)
+    total_retirement_fund = current_savings_future + monthly_savings_future
+    
+    retirement_needs = user_data['monthly_expenses'] * 12 * years_in_retirement
+    retirement_needs_pv = present_value(retirement_needs, user_data['expected_return'], years_to_retirement)
+    
+    return {
+        'years_to_retirement': years_to_retirement,
+        'years_in_retirement': years_in_retirement,
+        'current_savings_future': current_savings_future,
+        'monthly_savings_future': monthly_savings_future,
+        'total_retirement_fund': total_retirement_fund,
+        'retirement_needs': retirement_needs,
+        'retirement_needs_pv': retirement_needs_pv,
+        'surplus_deficit': total_retirement_fund - retirement_needs_pv,
+        'monthly_income': total_retirement_fund / years_in_retirement / 12,
+    }
+
+
+def growth_series(user_data):
+    """Year-by-year growth of current and monthly savings up to retirement (column lists)"""
+    years_to_retirement = user_data['retirement_age'] - user_data['age']
+    
+    # Create year-by-year data
+    years = list(range(years_to_retirement + 1))
+    current_savings_growth = []
+    monthly_savings_growth = []
+    total_growth = []
+    
+    for year in years:
+        # Current savings growth
+        current_val = future_value(user_data['current_savings'], user_data['expected_return'], year)
+        current_savings_growth.append(current_val)
+        
+        # Monthly savings accumulation
+        if year == 0:
+            monthly_val = 0
+        else:
+            monthly_val = monthly_savings_future_value(
+                user_data['monthly_savings'], user_data['expected_return'], year
+            )
+        monthly_savings_growth.append(monthly_val)
+        
+        total_growth.append(current_val + monthly_val)
+    
+    return {
+        'Year': years,
+        'Age': [user_data['age'] + y for y in years],
+        'Current Savings Growth': current_savings_growth,
+        'Monthly Savings Growth': monthly_savings_growth,
+        'Total': total_growth
+    }
+
+
 def calculate_nper(rate, payment, present_value, future_value=0):
     """
     Excel-style NPER function
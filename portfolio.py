@@ -0,0 +1,235 @@
+import numpy as np
+
+from exact_cents import accumulate_cents, from_cents, to_cents, withdraw_cents
+from financial_formulas import future_value, monthly_savings_future_value
+
+ASSET_CLASSES = ("stocks", "bonds", "cash")
+
+# Long-run capital market assumptions (annual)
+EXPECTED_RETURNS = np.array([0.09, 0.045, 0.025])
+VOLATILITIES = np.array([0.16, 0.06, 0.01])
+CORRELATIONS = np.array([
+    [1.00, 0.10, 0.00],
+    [0.10, 1.00, 0.20],
+    [0.00, 0.20, 1.00],
+])
+
+# Allocation at the start of saving -> allocation at the target date
+ALLOCATIONS = {
+    "Conservative": {"start": (0.40, 0.50, 0.10), "end": (0.20, 0.60, 0.20)},
+    "Balanced": {"start": (0.70, 0.25, 0.05), "end": (0.40, 0.50, 0.10)},
+    "Aggressive": {"start": (0.95, 0.05, 0.00), "end": (0.70, 0.25, 0.05)},
+}
+
+
+def glide_path(start_mix, end_mix, months):
+    """Monthly target weights moving linearly from start_mix to end_mix"""
+    start_mix = np.asarray(start_mix, dtype=float)
+    end_mix = np.asarray(end_mix, dtype=float)
+    if months <= 1:
+        return end_mix[None, :].copy()
+    steps = np.linspace(0.0, 1.0, months)[:, None]
+    return start_mix + (end_mix - start_mix) * steps
+
+
+def correlated_monthly_returns(n_paths, months, expected_returns=EXPECTED_RETURNS,
+                               volatilities=VOLATILITIES, correlations=CORRELATIONS, seed=None):
+    """
+    Simulate correlated lognormal monthly asset returns
+    Returns an array of shape (n_paths, months, n_assets)
+    """
+    expected_returns = np.asarray(expected_returns, dtype=float)
+    volatilities = np.asarray(volatilities, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    monthly_vol = volatilities / np.sqrt(12)
+    # Drift chosen so the expected annual growth matches expected_returns
+    monthly_drift = np.log1p(expected_returns) / 12 - monthly_vol ** 2 / 2
+    chol = np.linalg.cholesky(np.asarray(correlations, dtype=float))
+
+    shocks = rng.standard_normal((n_paths, months, len(expected_returns))) @ chol.T
+    return np.expm1(monthly_drift + shocks * monthly_vol)
+
+
+def rebalanced_returns(asset_returns, weights):
+    """
+    Portfolio returns when rebalancing to the target weights every month
+    asset_returns: (n_paths, months, n_assets)
+    weights: (months, n_assets) or (n_clients, months, n_assets)
+    Returns (n_paths, months) or (n_clients, n_paths, months)
+    """
+    weights = np.asarray(weights, dtype=float)
+    months = asset_returns.shape[1]
+    if weights.ndim == 2:
+        return np.einsum("pma,ma->pm", asset_returns, weights[:months])
+    return np.einsum("pma,cma->cpm", asset_returns, weights[:, :months])
+
+
+def project_accumulation(current_savings, monthly_savings, portfolio_returns, months=None,
+                         exact=False, rounding="half_even"):
+    """
+    Month-by-month balances while saving, vectorized across clients and paths
+    portfolio_returns: (..., n_paths, months); current_savings and monthly_savings
+    broadcast against the leading (client) axes.
+    months: optional per-client horizon; balances are frozen once it is reached.
+    exact: run the schedule in int64 cents, rounding interest every month;
+        balances are still returned in dollars (whole cents).
+    Returns balances of shape (..., n_paths, months + 1)
+    """
+    portfolio_returns = np.asarray(portfolio_returns, dtype=float)
+    lead = portfolio_returns.shape[:-1]
+    n_months = portfolio_returns.shape[-1]
+    current_savings = _client_axis(current_savings, len(lead))
+    monthly_savings = _client_axis(monthly_savings, len(lead))
+
+    active = _active_mask(months, lead, n_months)
+    if exact:
+        return from_cents(accumulate_cents(to_cents(current_savings), to_cents(monthly_savings),
+                                           portfolio_returns, active=active, rounding=rounding))
+    balances = np.empty(lead + (n_months + 1,))
+    balances[..., 0] = current_savings
+    for month in range(n_months):
+        grown = balances[..., month] * (1 + portfolio_returns[..., month]) + monthly_savings
+        balances[..., month + 1] = np.where(active[..., month], grown, balances[..., month])
+    return balances
+
+
+def project_withdrawals(starting_amount, monthly_withdrawal, portfolio_returns,
+                        exact=False, rounding="half_even"):
+    """
+    Month-by-month balances while withdrawing, vectorized across clients and paths
+    exact: run the schedule in int64 cents, rounding interest every month;
+        balances are still returned in dollars (whole cents).
+    Returns (balances, years_lasted); years_lasted is inf for paths never depleted
+    """
+    portfolio_returns = np.asarray(portfolio_returns, dtype=float)
+    lead = portfolio_returns.shape[:-1]
+    n_months = portfolio_returns.shape[-1]
+    starting_amount = _client_axis(starting_amount, len(lead))
+    monthly_withdrawal = _client_axis(monthly_withdrawal, len(lead))
+    if exact:
+        balances, months_lasted = withdraw_cents(to_cents(starting_amount), to_cents(monthly_withdrawal),
+                                                 portfolio_returns, rounding=rounding)
+        return from_cents(balances), months_lasted / 12
+
+    balances = np.empty(lead + (n_months + 1,))
+    balances[..., 0] = starting_amount
+    depleted_at = np.full(lead, np.inf)
+    for month in range(n_months):
+        after = balances[..., month] * (1 + portfolio_returns[..., month]) - monthly_withdrawal
+        newly_depleted = (after <= 0) & np.isinf(depleted_at)
+        # Count the final partial month so durations line up with withdrawal_duration
+        with np.errstate(divide='ignore', invalid='ignore'):
+            partial = balances[..., month] * (1 + portfolio_returns[..., month]) / monthly_withdrawal
+        depleted_at = np.where(newly_depleted, month + np.clip(partial, 0, 1), depleted_at)
+        balances[..., month + 1] = np.maximum(after, 0)
+    return balances, depleted_at / 12
+
+
+def _client_axis(values, ndim):
+    """Append trailing axes so per-client values broadcast over paths (and months)"""
+    values = np.asarray(values, dtype=float)
+    return values.reshape(values.shape + (1,) * (ndim - values.ndim))
+
+
+def _active_mask(months, lead, n_months):
+    """Boolean (..., n_months) mask of the months inside each client's horizon"""
+    if months is None:
+        return np.ones(lead + (n_months,), dtype=bool)
+    months = _client_axis(months, len(lead) + 1)
+    return np.broadcast_to(np.arange(n_months) < months, lead + (n_months,))
+
+
+def allocation_scenarios(user_data, allocations=None, n_paths=1000, years_in_retirement=25, seed=42):
+    """
+    Accumulation and withdrawal outcomes for several allocations in one batched run
+    All allocations share the same simulated asset return paths so they are comparable.
+    Returns {name: {"median_total", "p10_total", "p90_total", "monthly_income", "success_rate"}}
+    """
+    allocations = allocations or ALLOCATIONS
+    names = list(allocations)
+    saving_months = (user_data['retirement_age'] - user_data['age']) * 12
+    retired_months = years_in_retirement * 12
+
+    asset_returns = correlated_monthly_returns(n_paths, saving_months + retired_months, seed=seed)
+
+    # Glide down while saving, then hold the target-date mix in retirement
+    weights = np.stack([
+        np.concatenate([
+            glide_path(allocations[name]["start"], allocations[name]["end"], saving_months),
+            np.tile(np.asarray(allocations[name]["end"], dtype=float), (retired_months, 1)),
+        ])
+        for name in names
+    ])
+    returns = rebalanced_returns(asset_returns, weights)
+
+    accumulation = project_accumulation(
+        np.full(len(names), user_data['current_savings']),
+        np.full(len(names), user_data['monthly_savings']),
+        returns[..., :saving_months],
+    )
+    totals = accumulation[..., -1]
+    _, years_lasted = project_withdrawals(
+        totals, np.full(len(names), user_data['monthly_expenses']), returns[..., saving_months:]
+    )
+
+    p10, median, p90 = np.percentile(totals, [10, 50, 90], axis=-1)
+    success = (years_lasted >= years_in_retirement).mean(axis=-1)
+    return {
+        name: {
+            "median_total": float(median[i]),
+            "p10_total": float(p10[i]),
+            "p90_total": float(p90[i]),
+            "monthly_income": float(median[i]) / years_in_retirement / 12,
+            "success_rate": float(success[i]),
+        }
+        for i, name in enumerate(names)
+    }
+
+
+def scenario_rows(user_data, n_paths=1000):
+    """
+    Rows of the scenario comparison table (fixed-rate plans plus allocation scenarios)
+    Success Rate is the share of simulated paths whose fund lasts 25 years of
+    monthly_expenses; fixed-rate plans have no paths and show "—".
+    """
+    base_years = user_data['retirement_age'] - user_data['age']
+
+    scenarios = [
+        {"Scenario": "Current Plan", "Monthly": user_data['monthly_savings'], "Years": base_years, "Return": user_data['expected_return']},
+        {"Scenario": "Save $200 More", "Monthly": user_data['monthly_savings'] + 200, "Years": base_years, "Return": user_data['expected_return']},
+        {"Scenario": "Retire 2 Years Later", "Monthly": user_data['monthly_savings'], "Years": base_years + 2, "Return": user_data['expected_return']},
+    ]
+
+    results = []
+    for scenario in scenarios:
+        current_future = future_value(user_data['current_savings'], scenario['Return'], scenario['Years'])
+        monthly_future = monthly_savings_future_value(scenario['Monthly'], scenario['Return'], scenario['Years'])
+        total = current_future + monthly_future
+        monthly_income = total / 25 / 12  # Assume 25 years retirement
+
+        results.append({
+            "Scenario": scenario['Scenario'],
+            "Monthly Savings": f"${scenario['Monthly']:,}",
+            "Years Saving": scenario['Years'],
+            "Total at Retirement": f"${total:,.0f}",
+            "Monthly Income": f"${monthly_income:,.0f}",
+            "Success Rate": "—"
+        })
+
+    # Allocation scenarios share one batched simulation of correlated returns
+    allocations = {name: ALLOCATIONS[name] for name in ("Conservative", "Aggressive")}
+    simulated = allocation_scenarios(user_data, allocations, n_paths=n_paths)
+    for name, outcome in simulated.items():
+        start_stocks = allocations[name]["start"][0]
+        end_stocks = allocations[name]["end"][0]
+        results.append({
+            "Scenario": f"{name} ({start_stocks:.0%}→{end_stocks:.0%} stocks)",
+            "Monthly Savings": f"${user_data['monthly_savings']:,}",
+            "Years Saving": base_years,
+            "Total at Retirement": f"${outcome['median_total']:,.0f}",
+            "Monthly Income": f"${outcome['monthly_income']:,.0f}",
+            "Success Rate": f"{outcome['success_rate']:.0%}"
+        })
+
+    return results
@@ -0,0 +1,290 @@
+import argparse
+import csv
+import html
+import itertools
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+
+from financial_formulas import growth_series, plan_summary
+from portfolio import scenario_rows
+
+try:
+    from weasyprint import HTML as PdfDocument
+except ImportError:  # PDF output is optional
+    PdfDocument = None
+
+REQUIRED_FIELDS = ('age', 'retirement_age', 'current_savings', 'monthly_savings',
+                   'expected_return', 'monthly_expenses')
+NUMERIC_FIELDS = REQUIRED_FIELDS + ('annual_income',)
+
+REPORT_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>$name - Retirement Plan</title>
+<style>$css</style>
+</head>
+<body>
+<h1>💰 $name's Retirement Plan</h1>
+<div class="metrics">$metrics</div>
+<h2>📈 Money Growth to Age $retirement_age</h2>
+$chart
+<h2>🎯 Compare Scenarios</h2>
+$scenarios
+<h2>📊 Show Your Work</h2>
+$explanations
+</body>
+</html>
+""")
+
+METRIC_TEMPLATE = Template('<div class="metric"><span>$label</span><strong>$value</strong></div>')
+
+REPORT_CSS = """
+body { font-family: Helvetica, Arial, sans-serif; margin: 2em; color: #222; }
+.metrics { display: flex; gap: 1em; }
+.metric { border: 1px solid #ddd; padding: 0.8em; flex: 1; }
+.metric span { display: block; color: #666; font-size: 0.85em; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #ddd; padding: 0.4em; text-align: right; }
+.work { background: #f7f7f7; padding: 0.8em; margin-bottom: 1em; }
+"""
+
+# Per-worker state, set once by _init_worker and reused for every report
+_worker = {}
+
+
+def load_profiles(path):
+    """
+    Stream raw client records from a CSV, JSON-lines or JSON file
+    Records are validated by coerce_profile, so one bad row cannot stop a batch.
+    """
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+    elif path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        yield {'_error': f"invalid JSON line: {exc}"}
+    else:
+        with open(path, encoding='utf-8') as f:
+            yield from json.load(f)
+
+
+def coerce_profile(profile):
+    """
+    Validate a raw record and convert its numeric fields
+    expected_return is a decimal fraction like the app uses (0.07 for 7%);
+    values of 1 or more are rejected rather than guessed at.
+    Raises ValueError describing the first problem found.
+    """
+    if '_error' in profile:
+        raise ValueError(profile['_error'])
+    profile = dict(profile)
+    for field in NUMERIC_FIELDS:
+        if profile.get(field) in (None, ''):
+            if field in REQUIRED_FIELDS:
+                raise ValueError(f"missing {field}")
+            continue
+        try:
+            value = float(profile[field])
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} is not a number: {profile[field]!r}")
+        profile[field] = int(value) if value.is_integer() and field != 'expected_return' else value
+    for field in ('age', 'retirement_age'):
+        if not isinstance(profile[field], int):
+            raise ValueError(f"{field} must be a whole number of years, got {profile[field]}")
+    if not -1 < profile['expected_return'] < 1:
+        raise ValueError(f"expected_return must be a decimal fraction (0.07 for 7%), got {profile['expected_return']}")
+    if profile['retirement_age'] <= profile['age']:
+        raise ValueError("retirement_age must be after age")
+    return profile
+
+
+def growth_chart_svg(growth, retirement_age, width=640, height=320, pad=50):
+    """Static SVG version of the growth chart from growth_series columns"""
+    ages = list(growth['Age'])
+    current = list(growth['Current Savings Growth'])
+    total = list(growth['Total'])
+    max_value = max(total) or 1
+    span = max(ages[-1] - ages[0], 1)
+
+    def point(age, value):
+        x = pad + (age - ages[0]) / span * (width - 2 * pad)
+        y = height - pad - value / max_value * (height - 2 * pad)
+        return f"{x:.1f},{y:.1f}"
+
+    baseline = [point(ages[-1], 0), point(ages[0], 0)]
+    current_area = " ".join([point(a, v) for a, v in zip(ages, current)] + baseline)
+    total_area = " ".join([point(a, v) for a, v in zip(ages, total)]
+                          + [point(a, v) for a, v in reversed(list(zip(ages, current)))])
+    ticks = "".join(
+        f'<text x="{pad - 6}" y="{height - pad - f * (height - 2 * pad) + 4:.1f}" text-anchor="end" font-size="10">'
+        f'${max_value * f:,.0f}</text>'
+        for f in (0, 0.5, 1)
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+        f'<polygon points="{current_area}" fill="lightblue"/>'
+        f'<polygon points="{total_area}" fill="darkblue" fill-opacity="0.8"/>'
+        f'<line x1="{pad}" y1="{height - pad}" x2="{width - pad}" y2="{height - pad}" stroke="#333"/>'
+        f'<line x1="{pad}" y1="{pad}" x2="{pad}" y2="{height - pad}" stroke="#333"/>'
+        f'{ticks}'
+        f'<text x="{pad}" y="{height - pad + 16}" font-size="10">Age {ages[0]}</text>'
+        f'<text x="{width - pad}" y="{height - pad + 16}" text-anchor="end" font-size="10">'
+        f'Age {retirement_age}</text>'
+        '</svg>'
+    )
+
+
+def report_questions(user_data, summary):
+    """The "show your work" questions answered in every report"""
+    target = user_data['monthly_expenses'] * 12 * summary['years_in_retirement']
+    return [
+        "What age can I retire?",
+        f"How long will ${summary['total_retirement_fund']:,.0f} last if I withdraw "
+        f"${user_data['monthly_expenses']:,.0f} a month at {user_data['expected_return']*100:g}%?",
+        f"How much must I save monthly to reach ${target:,.0f} in {summary['years_to_retirement']} years?",
+        "What if inflation is 3%?",
+    ]
+
+
+def markdown_to_html(text):
+    """Minimal conversion of the agent's show-your-work markdown"""
+    text = html.escape(text.strip())
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    return text.replace('\n', '<br>\n')
+
+
+def scenario_table_html(rows):
+    """HTML table of scenario_rows"""
+    header = "".join(f"<th>{html.escape(column)}</th>" for column in rows[0])
+    body = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in row.values()) + "</tr>"
+        for row in rows
+    )
+    return f"<table><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def render_report(user_data, n_paths=200):
+    """Render one client's plan report (a coerced profile) as an HTML string"""
+    summary = plan_summary(user_data)
+    metrics = "".join(
+        METRIC_TEMPLATE.substitute(label=label, value=value)
+        for label, value in [
+            ("Years to Retirement", f"{summary['years_to_retirement']} years"),
+            ("Projected Fund", f"${summary['total_retirement_fund']:,.0f}"),
+            ("Retirement Needs", f"${summary['retirement_needs']:,.0f}"),
+            ("Surplus/Deficit", f"${summary['surplus_deficit']:,.0f}"),
+        ]
+    )
+    scenarios = scenario_table_html(scenario_rows(user_data, n_paths=n_paths))
+    agent = _worker.get('agent') or _default_agent()
+    explanations = "".join(
+        f'<div class="work">{markdown_to_html(agent.process_question(q, user_data, show_work=True))}</div>'
+        for q in report_questions(user_data, summary)
+    )
+    return REPORT_TEMPLATE.substitute(
+        name=html.escape(str(user_data.get('name', 'Client'))),
+        retirement_age=user_data['retirement_age'],
+        css=REPORT_CSS,
+        metrics=metrics,
+        chart=growth_chart_svg(growth_series(user_data), user_data['retirement_age']),
+        scenarios=scenarios,
+        explanations=explanations,
+    )
+
+
+def _default_agent():
+    from agent import FinancialPlanningAgent
+    return FinancialPlanningAgent()
+
+
+def _init_worker(output_dir, formats, n_paths):
+    """Set up shared state once per worker process (no UI modules are imported)"""
+    _worker.update(output_dir=output_dir, formats=formats, n_paths=n_paths, agent=_default_agent())
+
+
+def _report_filename(index, user_data):
+    client_id = str(user_data.get('client_id') or user_data.get('name') or 'client')
+    return f"{index:07d}_{re.sub(r'[^A-Za-z0-9_-]+', '_', client_id)}"
+
+
+def _write_report(job):
+    """Worker task: render one report and write it straight to disk"""
+    index, record = job
+    try:
+        user_data = coerce_profile(record)
+        base = os.path.join(_worker['output_dir'], _report_filename(index, user_data))
+        document = render_report(user_data, n_paths=_worker['n_paths'])
+        written = []
+        if 'html' in _worker['formats']:
+            with open(base + '.html', 'w', encoding='utf-8') as f:
+                f.write(document)
+            written.append(base + '.html')
+        if 'pdf' in _worker['formats']:
+            PdfDocument(string=document).write_pdf(base + '.pdf')
+            written.append(base + '.pdf')
+        return index, written, None
+    except Exception as exc:
+        return index, [], f"{type(exc).__name__}: {exc}"
+
+
+def generate_reports(profile_path, output_dir, formats=("html",), workers=None, batch_size=1000, n_paths=200):
+    """
+    Render every profile in profile_path to output_dir using a process pool
+    Profiles are streamed in batches so memory stays flat for large books, and
+    a manifest.csv listing each report (or its error) is written as results arrive.
+    Returns (reports_written, failures)
+    """
+    if 'pdf' in formats and PdfDocument is None:
+        raise RuntimeError("PDF reports need weasyprint: pip install weasyprint")
+    os.makedirs(output_dir, exist_ok=True)
+
+    written = failures = 0
+    jobs = enumerate(load_profiles(profile_path))
+    with open(os.path.join(output_dir, 'manifest.csv'), 'w', newline='', encoding='utf-8') as manifest_file, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(output_dir, tuple(formats), n_paths)) as pool:
+        manifest = csv.writer(manifest_file)
+        manifest.writerow(['index', 'files', 'error'])
+        chunksize = max(1, batch_size // (4 * (workers or os.cpu_count() or 1)))
+        while True:
+            batch = list(itertools.islice(jobs, batch_size))
+            if not batch:
+                break
+            for index, files, error in pool.map(_write_report, batch, chunksize=chunksize):
+                manifest.writerow([index, ";".join(files), error or ""])
+                if error:
+                    failures += 1
+                else:
+                    written += 1
+            manifest_file.flush()
+    return written, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate client plan reports in batch")
+    parser.add_argument("profiles", help="CSV, JSON-lines or JSON file of client profiles")
+    parser.add_argument("output_dir", help="Directory to write reports into")
+    parser.add_argument("--format", choices=["html", "pdf", "both"], default="html")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--paths", type=int, default=200, help="Simulated paths for allocation scenarios")
+    args = parser.parse_args()
+
+    formats = ("html", "pdf") if args.format == "both" else (args.format,)
+    written, failures = generate_reports(args.profiles, args.output_dir, formats,
+                                         args.workers, args.batch_size, args.paths)
+    print(f"✅ Wrote {written} reports ({failures} failed) to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
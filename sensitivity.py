@@ -0,0 +1,112 @@
+import numpy as np
+
+INPUTS = ('expected_return', 'monthly_savings', 'retirement_age', 'current_savings')
+
+# Below this monthly rate the closed forms switch to their zero-rate limits
+_SMALL_RATE = 1e-9
+
+
+def plan_sensitivities(current_savings, monthly_savings, expected_return, age, retirement_age,
+                       monthly_expenses, years_in_retirement=25):
+    """
+    Closed-form partial derivatives of the plan outputs, vectorized over profiles
+    Every argument may be a scalar or an array; results broadcast together.
+    Outputs (same formulas as plan_summary and withdrawal_duration):
+        fund: projected fund at retirement
+        surplus: fund minus the present value of retirement needs
+        withdrawal_years: how long the fund lasts withdrawing monthly_expenses
+    Returns {output: {'value': ..., 'expected_return': d/dr, 'monthly_savings': d/dP,
+    'retirement_age': d/dyear, 'current_savings': d/dS}}. Derivatives of an
+    infinite withdrawal duration are reported as 0.
+    """
+    S = np.asarray(current_savings, dtype=float)
+    P = np.asarray(monthly_savings, dtype=float)
+    r = np.asarray(expected_return, dtype=float)
+    n = np.asarray(retirement_age, dtype=float) - np.asarray(age, dtype=float)
+    w = np.asarray(monthly_expenses, dtype=float)
+
+    growth = (1 + r) ** n
+    m = (1 + r) ** (1/12) - 1
+    dm_dr = (1 + r) ** (-11/12) / 12
+    N = 12 * n
+    small = np.abs(m) < _SMALL_RATE
+    safe_m = np.where(small, 1.0, m)
+
+    # Annuity factor A = ((1 + m)^N - 1) / m and its partials
+    compound = (1 + m) ** N
+    annuity = np.where(small, N, (compound - 1) / safe_m)
+    dA_dm = np.where(small, N * (N - 1) / 2,
+                     (N * (1 + m) ** (N - 1) * safe_m - (compound - 1)) / safe_m ** 2)
+    dA_dn = np.where(small, 12.0, 12 * compound * np.log1p(m) / safe_m)
+
+    fund = S * growth + P * annuity
+    dfund = {
+        'expected_return': S * n * (1 + r) ** (n - 1) + P * dA_dm * dm_dr,
+        'monthly_savings': annuity,
+        'retirement_age': S * growth * np.log1p(r) + P * dA_dn,
+        'current_savings': growth,
+    }
+
+    needs = w * 12 * years_in_retirement
+    needs_pv = needs / growth
+    surplus = fund - needs_pv
+    dsurplus = {
+        'expected_return': dfund['expected_return'] + n * needs / (1 + r) ** (n + 1),
+        'monthly_savings': dfund['monthly_savings'],
+        'retirement_age': dfund['retirement_age'] + needs_pv * np.log1p(r),
+        'current_savings': dfund['current_savings'],
+    }
+
+    years, dyears_dfund, dyears_dm = _withdrawal_years(fund, w, m, small, safe_m)
+    dyears = {name: dyears_dfund * dfund[name] for name in INPUTS}
+    dyears['expected_return'] = dyears['expected_return'] + dyears_dm * dm_dr
+
+    return {
+        'fund': {'value': fund, **dfund},
+        'surplus': {'value': surplus, **dsurplus},
+        'withdrawal_years': {'value': years, **dyears},
+    }
+
+
+def _withdrawal_years(fund, w, m, small, safe_m):
+    """Duration T = -ln(1 - F m / w) / ln(1 + m) / 12 with dT/dF and the direct dT/dm"""
+    x = fund * m / w
+    forever = (x >= 1) & ~small
+    safe_x = np.where(forever, 0.0, x)
+    log_growth = np.where(small, 1.0, np.log1p(safe_m))
+
+    months = np.where(small, fund / w, -np.log1p(-safe_x) / log_growth)
+    dmonths_dfund = np.where(small, 1 / w, (safe_m / w) / (1 - safe_x) / log_growth)
+    dmonths_dm = np.where(
+        small,
+        (fund / w) * (fund / (2 * w) + 0.5),
+        ((fund / w) / (1 - safe_x) * log_growth + np.log1p(-safe_x) / (1 + safe_m)) / log_growth ** 2,
+    )
+    return (np.where(forever, np.inf, months / 12),
+            np.where(forever, 0.0, dmonths_dfund / 12),
+            np.where(forever, 0.0, dmonths_dm / 12))
+
+
+def profile_sensitivities(profiles, years_in_retirement=25):
+    """plan_sensitivities for a list of user_data dicts in one vectorized pass"""
+    columns = {
+        field: np.array([profile[field] for profile in profiles], dtype=float)
+        for field in ('current_savings', 'monthly_savings', 'expected_return', 'age',
+                      'retirement_age', 'monthly_expenses')
+    }
+    return plan_sensitivities(years_in_retirement=years_in_retirement, **columns)
+
+
+def tornado_impacts(user_data, output='fund', steps=None):
+    """
+    Linearized impact of one step in each input on an output, largest first
+    steps default to +1% return, +$100/month, +1 year of work and +$10,000 saved.
+    """
+    steps = steps or {'expected_return': 0.01, 'monthly_savings': 100,
+                      'retirement_age': 1, 'current_savings': 10000}
+    gradient = plan_sensitivities(
+        user_data['current_savings'], user_data['monthly_savings'], user_data['expected_return'],
+        user_data['age'], user_data['retirement_age'], user_data['monthly_expenses'],
+    )[output]
+    impacts = [(name, float(gradient[name]) * step) for name, step in steps.items()]
+    return sorted(impacts, key=lambda item: abs(item[1]), reverse=True)
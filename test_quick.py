@@ -17,5 +17,238 @@ def test_basics():
     
     print("✅ All tests passed!")
 
+def test_portfolio():
+    import numpy as np
+    from portfolio import project_accumulation, project_withdrawals
+
+    # With a constant 7% return the simulation must match the closed-form formulas
+    monthly_return = np.full((1, 360), 1.07 ** (1/12) - 1)
+    balances = project_accumulation(15000, 800, monthly_return)
+    expected = future_value(15000, 0.07, 30) + monthly_savings_future_value(800, 0.07, 30)
+    assert abs(balances[0, -1] - expected) < 0.01, "Portfolio accumulation test failed"
+
+    _, years = project_withdrawals(500000, 3000, np.full((1, 600), 1.05 ** (1/12) - 1))
+    assert abs(years[0] - withdrawal_duration(500000, 3000, 0.05)) < 0.01, "Portfolio withdrawal test failed"
+
+    # Allocation rows report the simulated withdrawal success rate
+    from portfolio import scenario_rows
+    profile = {'age': 30, 'retirement_age': 65, 'current_savings': 15000, 'monthly_savings': 800,
+               'expected_return': 0.07, 'monthly_expenses': 4000}
+    rates = [row['Success Rate'] for row in scenario_rows(profile, n_paths=50)]
+    assert rates[:3] == ["—"] * 3 and all(rate.endswith("%") for rate in rates[3:]), "Scenario success test failed"
+    print("✅ Portfolio tests passed!")
+
+def test_exact_cents():
+    # Exact mode settles to whole cents and stays within cents of the float path
+    exact = monthly_savings_future_value(800, 0.07, 30, exact=True)
+    assert round(exact, 2) == exact, "Exact mode returned fractional cents"
+    assert abs(exact - monthly_savings_future_value(800, 0.07, 30)) < 5, "Exact savings test failed"
+    assert future_value(1000, 0.06, 10, exact=True) == 1790.85, "Exact future value test failed"
+
+    years = withdrawal_duration(500000, 3000, 0.05, exact=True)
+    assert abs(years - withdrawal_duration(500000, 3000, 0.05)) < 0.01, "Exact withdrawal test failed"
+    assert withdrawal_duration(1000000, 3000, 0.05, exact=True) == float('inf'), "Exact perpetuity test failed"
+    assert withdrawal_duration(100000.01, 3000, 0, exact=True) == 10000001 / 300000 / 12
+    assert withdrawal_duration(2000000, 1, 0, exact=True) == 2000000 / 12, "Exact zero-rate test failed"
+
+    # exact only changes rounding, not units, so the projections chain in dollars
+    import numpy as np
+    from portfolio import project_accumulation, project_withdrawals
+    returns = np.full((1, 12), 0.005)
+    for exact in (False, True):
+        saved = project_accumulation(1000, 500, returns, exact=exact)[..., -1]
+        balances, years = project_withdrawals(saved, 3500, returns, exact=exact)
+        assert abs(saved[0] - 7229.45) < 0.01 and abs(years[0] - 0.1735) < 0.001, "Exact chaining test failed"
+
+    # Stub periods are rejected rather than silently truncated
+    for call in (lambda: future_value(1000, 0.06, 10.5, exact=True),
+                 lambda: monthly_savings_future_value(800, 0.07, 10.01, exact=True)):
+        try:
+            call()
+            assert False, "Fractional period test failed"
+        except ValueError:
+            pass
+    print("✅ Exact cents tests passed!")
+
+def test_reports():
+    import csv
+    import os
+    import tempfile
+    from reports import coerce_profile, generate_reports, render_report
+
+    profile = coerce_profile({'client_id': 'c1', 'name': 'Ann', 'age': '30', 'retirement_age': '65',
+                              'current_savings': '15000', 'monthly_savings': '800',
+                              'expected_return': '0.07', 'monthly_expenses': '4000'})
+    document = render_report(profile, n_paths=20)
+    assert "<svg" in document and "<table>" in document, "Report render test failed"
+    assert "retire at age inf" not in document, "Retirement age test failed"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "clients.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(profile))
+            writer.writeheader()
+            writer.writerow(profile)
+            writer.writerow({**profile, 'client_id': 'bad', 'expected_return': ''})
+            writer.writerow({**profile, 'client_id': 'percent', 'expected_return': '1'})
+            writer.writerow({**profile, 'client_id': 'half', 'age': '30.5'})
+        written, failures = generate_reports(path, os.path.join(tmp_dir, "out"), workers=1, n_paths=20)
+        assert (written, failures) == (1, 3), "Batch report test failed"
+        with open(os.path.join(tmp_dir, "out", "manifest.csv")) as f:
+            errors = [row['error'] for row in csv.DictReader(f)]
+        assert errors[0] == "" and "missing expected_return" in errors[1] and "decimal fraction" in errors[2]
+        assert "age must be a whole number" in errors[3], "Fractional age test failed"
+    print("✅ Report tests passed!")
+
+def test_withdrawal_strategies():
+    import numpy as np
+    from withdrawal_strategies import simulate_withdrawal_strategies, STRATEGIES
+
+    # With flat returns and no inflation, constant dollar pays the initial 4% every year
+    results = simulate_withdrawal_strategies([1000000, 500000], np.zeros((3, 120)), inflation=0)
+    assert set(results) == set(STRATEGIES), "Strategy comparison test failed"
+    assert np.allclose(results['Constant dollar']['incomes'][0], 40000), "Constant dollar test failed"
+    assert results['Constant dollar']['depletion_probability'][1] == 0, "Depletion test failed"
+
+    # VPW with no assumed return pays balance / years left; poor markets shrink income, never deplete
+    flat = simulate_withdrawal_strategies([1000000], np.zeros((1, 120)), inflation=0, vpw_return=0)
+    assert np.allclose(flat['Variable percentage (VPW)']['incomes'], 100000), "VPW amortization test failed"
+    falling = simulate_withdrawal_strategies([1000000], np.full((1, 120), -0.01))['Variable percentage (VPW)']
+    assert falling['depletion_probability'][0] == 0 and falling['median_ending_balance'][0] < 1e-6, "VPW spend-down test failed"
+
+    # Year 2 after a crash, a flat year and a boom (first month -50%, 0%, +100%)
+    returns = np.zeros((3, 360))
+    returns[:, 0] = [-0.5, 0.0, 1.0]
+    guardrails = simulate_withdrawal_strategies([1000000], returns)['Guyton-Klinger guardrails']['incomes'][0, :, 1]
+    assert np.allclose(guardrails, [36000, 41000, 45100]), "Guyton-Klinger test failed"
+    banded = simulate_withdrawal_strategies([1000000], returns, inflation=0)['Floor and ceiling']['incomes'][0, :, 1]
+    assert np.allclose(banded, [34000, 38400, 50000]), "Floor and ceiling test failed"
+
+    # A mild dip (+30% in year 1, -1% in year 2) keeps the raise while withdrawing below 4%
+    mild = np.zeros((1, 360))
+    mild[0, 0], mild[0, 12] = 0.3, -0.01
+    ahead = simulate_withdrawal_strategies([1000000], mild)['Guyton-Klinger guardrails']['incomes'][0, 0]
+    assert np.allclose(ahead[1:3], [41000, 42025]), "Guyton-Klinger freeze test failed"
+
+    try:
+        simulate_withdrawal_strategies([1000000], np.zeros((1, 125)))
+        assert False, "Partial year test failed"
+    except ValueError:
+        pass
+    print("✅ Withdrawal strategy tests passed!")
+
+def test_answer_cache():
+    import os
+    import tempfile
+    from agent import FinancialPlanningAgent
+    from answer_cache import AnswerCache
+
+    user_data = {'age': 30, 'retirement_age': 65, 'monthly_expenses': 4000, 'expected_return': 0.07}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "answers.sqlite")
+        agent = FinancialPlanningAgent(cache=AnswerCache(path))
+        first = agent.process_question("How long will $400,000 last if I withdraw $3,000 a month at 5%?", user_data)
+        second = agent.process_question("how long would 400000 last withdrawing 3000 monthly at 5 %", user_data)
+        assert first == second and agent.cache.stats()['hits'] == 1, "Canonical cache test failed"
+
+        # Keys come from the same parse as the answers, so case cannot alias different horizons
+        thirty = agent.process_question("How much must I save monthly to reach $1 million in 30 Years?", user_data)
+        twenty_five = agent.process_question("How much must I save monthly to reach $1 million in 25 years?", user_data)
+        assert "30 years" in thirty and thirty != twenty_five, "Cache key parse test failed"
+        assert agent.process_question("how much must i save monthly to reach $1 million in 30 years?", user_data) == thirty
+        agent.cache.close()
+
+        # A fresh cache on the same file starts warm
+        restarted = AnswerCache(path)
+        assert restarted.get(agent.canonical_key("How long will $400000 last at 3000 and 5%?", user_data)) == first
+        restarted.close()
+    print("✅ Answer cache tests passed!")
+
+def test_debt_payoff():
+    import numpy as np
+    from debt_payoff import simulate_debt_payoff, best_budget_split
+
+    # $10k at 12% APR paying $200/month is paid off in month 70 (NPER = 69.7)
+    result = simulate_debt_payoff([10000], [0.12], [200], 0, months=120)
+    assert result['payoff_month'][0] == 70, "Debt payoff month test failed"
+
+    # Prepaying a 22% card beats investing at 7%
+    shares, final = best_budget_split([[5000, 12000]], [[0.22, 0.06]], [[150, 250]], [500], splits=11)
+    assert final.shape == (1, 11) and shares[0] == 0, "Budget split test failed"
+
+    # Final-state-only runs and client chunking leave the answer unchanged
+    book = np.random.default_rng(0).uniform([500, 0.03, 20], [30000, 0.28, 400], (7, 3, 3))
+    budgets = np.linspace(100, 700, 7)
+    full = simulate_debt_payoff(book[..., 0], book[..., 1], book[..., 2], budgets)
+    final_only = simulate_debt_payoff(book[..., 0], book[..., 1], book[..., 2], budgets, keep_path=False)
+    assert 'net_worth' not in final_only and np.allclose(final_only['final_net_worth'], full['net_worth'][..., -1])
+    whole = best_budget_split(book[..., 0], book[..., 1], book[..., 2], budgets, splits=5)
+    chunked = best_budget_split(book[..., 0], book[..., 1], book[..., 2], budgets, splits=5, client_chunk=3)
+    assert np.array_equal(whole[0], chunked[0]) and np.allclose(whole[1], chunked[1]), "Chunked split test failed"
+    print("✅ Debt payoff tests passed!")
+
+def test_sensitivity():
+    from sensitivity import plan_sensitivities
+
+    profile = {'current_savings': 15000, 'monthly_savings': 800, 'expected_return': 0.07,
+               'age': 30, 'retirement_age': 65, 'monthly_expenses': 4000}
+    gradient = plan_sensitivities(**profile)
+
+    # Analytic slopes agree with central differences of the plan outputs
+    for field, step in [('expected_return', 1e-6), ('monthly_savings', 1e-3), ('retirement_age', 1e-5)]:
+        up = plan_summary({**profile, field: profile[field] + step})
+        down = plan_summary({**profile, field: profile[field] - step})
+        for output, key in [('fund', 'total_retirement_fund'), ('surplus', 'surplus_deficit')]:
+            numeric = (up[key] - down[key]) / (2 * step)
+            assert abs(gradient[output][field] - numeric) < 1e-4 * abs(numeric), f"{output}/{field} sensitivity failed"
+
+    # Zero return uses the limit instead of dividing by zero
+    assert plan_sensitivities(**{**profile, 'expected_return': 0.0})['fund']['monthly_savings'] == 420
+    print("✅ Sensitivity tests passed!")
+
+def test_balance_feeds():
+    import os
+    import tempfile
+    import numpy as np
+    from balance_feeds import PlanStore, load_feed
+
+    profile = {'client_id': 'c1', 'age': 30, 'retirement_age': 65, 'current_savings': 15000,
+               'monthly_savings': 800, 'expected_return': 0.07, 'monthly_expenses': 4000}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = PlanStore(os.path.join(tmp_dir, "plans.sqlite"))
+        store.register_plans([profile], "2026-10")
+
+        # Landing exactly on the original projection leaves the fund unchanged
+        expected = future_value(15000, 0.07, 1) + monthly_savings_future_value(800, 0.07, 1)
+        feed = {'client_id': np.array(['c1'], dtype=object), 'month': np.array([2027 * 12 + 9]),
+                'balance': np.array([expected]), 'contribution': np.array([9600.0])}
+        [summary] = store.ingest(feed)
+        assert abs(summary['balance_drift']) < 0.01 and abs(summary['fund_drift']) < 0.01, "Drift test failed"
+        assert abs(summary['projected_fund'] - plan_summary(profile)['total_retirement_fund']) < 0.01
+
+        # Replaying the same feed is a no-op
+        assert store.ingest(feed) == [], "Checkpoint test failed"
+
+        # Bad records are skipped and reported; a repeated month counts once
+        path = os.path.join(tmp_dir, "feed.csv")
+        with open(path, "w", newline="") as f:
+            f.write("client_id,month,balance,contribution\n"
+                    "c1,2027-11,26000,800\nc1,2027-11,26000,800\n"
+                    "c1,2027-12,,800\nc1,2027-13,26500,800\nc1,,26500,800\n")
+        feed, rejected = load_feed(path)
+        assert [number for number, _ in rejected] == [3, 4, 5], "Feed validation test failed"
+        [summary] = store.ingest(feed)
+        assert summary['contribution_gap'] == 0, "Duplicate record test failed"
+        store.close()
+    print("✅ Balance feed tests passed!")
+
 if __name__ == "__main__":
-    test_basics()
\ No newline at end of file
+    test_basics()
+    test_portfolio()
+    test_exact_cents()
+    test_reports()
+    test_withdrawal_strategies()
+    test_answer_cache()
+    test_debt_payoff()
+    test_sensitivity()
+    test_balance_feeds()
\ No newline at end of file
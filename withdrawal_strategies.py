@@ -0,0 +1,167 @@
+import numpy as np
+
+# Settings shared by the built-in strategies; override any of them per run
+DEFAULT_PARAMS = {
+    'initial_rate': 0.04,        # first-year withdrawal as a share of the starting balance
+    'inflation': 0.025,
+    'guardrail': 0.20,           # Guyton-Klinger: +/-20% band around the initial rate
+    'adjustment': 0.10,          # Guyton-Klinger: cut or raise by 10% when a guardrail is hit
+    'guardrail_stop_years': 15,  # Guyton-Klinger: no capital-preservation cuts in the last 15 years
+    'vpw_return': 0.04,          # VPW: return assumed when amortizing the remaining balance
+    'floor': 0.85,               # Floor-and-ceiling: band around the inflation-adjusted initial amount
+    'ceiling': 1.25,
+}
+
+
+def constant_dollar(state, params):
+    """Initial amount raised with inflation every year, regardless of markets"""
+    return state['initial_withdrawal'] * state['inflation_index']
+
+
+def constant_percentage(state, params):
+    """Fixed share of the current balance"""
+    return params['initial_rate'] * state['balance']
+
+
+def guyton_klinger(state, params):
+    """Inflation-adjusted amount with a freeze after losing years and +/- guardrails"""
+    if state['year'] == 0:
+        return state['initial_withdrawal'] * np.ones_like(state['balance'])
+
+    # Skip the inflation raise after a negative year, but only while withdrawing above the initial rate
+    with np.errstate(divide='ignore', invalid='ignore'):
+        freeze = ((state['last_year_return'] < 0)
+                  & (state['previous_withdrawal'] / state['balance'] > params['initial_rate']))
+    withdrawal = np.where(freeze,
+                          state['previous_withdrawal'],
+                          state['previous_withdrawal'] * (1 + params['inflation']))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        current_rate = withdrawal / state['balance']
+
+    upper = params['initial_rate'] * (1 + params['guardrail'])
+    lower = params['initial_rate'] * (1 - params['guardrail'])
+    cut = (current_rate > upper) & (state['years_remaining'] > params['guardrail_stop_years'])
+    raise_ = current_rate < lower
+    return np.where(cut, withdrawal * (1 - params['adjustment']),
+                    np.where(raise_, withdrawal * (1 + params['adjustment']), withdrawal))
+
+
+def variable_percentage(state, params):
+    """VPW: amortize the current balance over the remaining years"""
+    rate = params['vpw_return']
+    years_remaining = state['years_remaining']
+    if rate == 0:
+        return state['balance'] / years_remaining
+    return state['balance'] * rate / (1 - (1 + rate) ** -years_remaining)
+
+
+# VPW plans to reach zero, so its final year pays out whatever balance is realized
+variable_percentage.spends_down = True
+
+
+def floor_and_ceiling(state, params):
+    """Constant percentage, clipped to a band around the inflation-adjusted initial amount"""
+    base = state['initial_withdrawal'] * state['inflation_index']
+    return np.clip(params['initial_rate'] * state['balance'], params['floor'] * base, params['ceiling'] * base)
+
+
+STRATEGIES = {
+    'Constant dollar': constant_dollar,
+    'Constant percentage': constant_percentage,
+    'Guyton-Klinger guardrails': guyton_klinger,
+    'Variable percentage (VPW)': variable_percentage,
+    'Floor and ceiling': floor_and_ceiling,
+}
+
+
+def simulate_withdrawal_strategies(starting_balances, portfolio_returns, strategies=None, **params):
+    """
+    Run several withdrawal strategies side by side over the same return paths
+    starting_balances: (n_clients,) balances at retirement
+    portfolio_returns: monthly returns, (n_paths, months) shared by all clients
+        or (n_clients, n_paths, months)
+    strategies: {name: rule}; a rule gets (state, params) at the start of each
+        year and returns the annual withdrawal for every client and path. Rules
+        marked spends_down = True are instead paid balance / months left in every
+        month of the final year, so a planned spend-down is never a depletion.
+    Returns {name: stats} (see withdrawal_statistics) plus the annual incomes
+    """
+    strategies = strategies or STRATEGIES
+    params = {**DEFAULT_PARAMS, **params}
+    names = list(strategies)
+
+    starting_balances = np.atleast_1d(np.asarray(starting_balances, dtype=float))
+    portfolio_returns = np.asarray(portfolio_returns, dtype=float)
+    n_clients = len(starting_balances)
+    n_paths, n_months = portfolio_returns.shape[-2:]
+    portfolio_returns = np.broadcast_to(portfolio_returns, (n_clients, n_paths, n_months))
+    if n_months % 12:
+        raise ValueError(f"portfolio_returns must cover whole years (a multiple of 12 months), got {n_months} months")
+    years = n_months // 12
+    spends_down = np.array([getattr(strategies[name], 'spends_down', False) for name in names])
+
+    # One balance per strategy, client and path; the return paths are shared
+    balance = np.broadcast_to(starting_balances[:, None], (len(names), n_clients, n_paths)).copy()
+    previous = np.zeros_like(balance)
+    incomes = np.zeros(balance.shape + (years,))
+    depleted_at = np.full(balance.shape, np.inf)
+    initial_withdrawal = params['initial_rate'] * starting_balances[:, None]
+    last_year_return = np.zeros((n_clients, n_paths))
+
+    for year in range(years):
+        planned = np.empty_like(balance)
+        for s, name in enumerate(names):
+            state = {
+                'year': year,
+                'years_remaining': years - year,
+                'balance': balance[s],
+                'start_balance': starting_balances[:, None],
+                'initial_withdrawal': initial_withdrawal,
+                'previous_withdrawal': previous[s],
+                'last_year_return': last_year_return,
+                'inflation_index': (1 + params['inflation']) ** year,
+            }
+            planned[s] = strategies[name](state, params)
+        planned = np.maximum(planned, 0)
+        monthly = planned / 12
+
+        year_returns = portfolio_returns[..., year * 12:(year + 1) * 12]
+        final_year = year == years - 1
+        for month in range(12):
+            balance *= 1 + year_returns[..., month]
+            if final_year:
+                monthly[spends_down] = balance[spends_down] / (12 - month)
+            taken = np.minimum(monthly, balance)
+            balance -= taken
+            incomes[..., year] += taken
+            newly_depleted = (balance <= 0) & (taken < monthly) & np.isinf(depleted_at)
+            depleted_at[newly_depleted] = year + (month + 1) / 12
+
+        last_year_return = np.prod(1 + year_returns, axis=-1) - 1
+        previous = planned
+
+    real_incomes = incomes / (1 + params['inflation']) ** np.arange(years)
+    return {
+        name: {**withdrawal_statistics(real_incomes[s], balance[s], depleted_at[s]), 'incomes': incomes[s]}
+        for s, name in enumerate(names)
+    }
+
+
+def withdrawal_statistics(real_incomes, ending_balances, years_lasted):
+    """
+    Per-client income and depletion statistics across paths
+    real_incomes: (n_clients, n_paths, years) in today's dollars
+    Running out in the final month is not a depletion: VPW spends down by design.
+    """
+    mean_income = real_incomes.mean(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatility = np.where(mean_income > 0, real_incomes.std(axis=-1) / mean_income, 0.0)
+    depleted = years_lasted < real_incomes.shape[-1]
+    return {
+        'median_annual_income': np.median(mean_income, axis=-1),
+        'income_volatility': volatility.mean(axis=-1),
+        'p10_lowest_income': np.percentile(real_incomes.min(axis=-1), 10, axis=-1),
+        'depletion_probability': depleted.mean(axis=-1),
+        'median_years_lasted': np.median(years_lasted, axis=-1),
+        'median_ending_balance': np.median(ending_balances, axis=-1),
+    }